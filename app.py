@@ -21,16 +21,39 @@ launch via the Streamlit command:
     pip install streamlit pandas openpyxl
     streamlit run app.py
 
+Installing ``numba`` as well lets the scheduling helpers run as compiled
+code; without it they run as plain Python.
+
 """
 
+import functools
+import io
+import itertools
 import math
 import datetime
+import zipfile
 from typing import Dict, List, Tuple
+from xml.sax.saxutils import escape
 
 import random
+import numpy as np
+import openpyxl
+from openpyxl.utils import get_column_letter
 import streamlit as st
 import pandas as pd
 
+try:
+    from numba import njit
+except ImportError:  # numba is optional; fall back to plain Python
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+# Shared random number generator for exercise selection and rep counts.
+# Seed it (``_RNG.seed(...)``) to reproduce a program.
+_RNG = random.Random()
+
 # -----------------------------------------------------------------------------
 # Data definitions
 # -----------------------------------------------------------------------------
@@ -87,6 +110,8 @@ INTENSITY_LEVELS = {
     "High Intensity": (9, 10),
 }
 PROGRESSION_TYPES = ["Linear", "Undulating", "Block", "Conjugate"]
+# Integer codes for the progression types, used by the compiled helpers.
+_PROG = {"linear": 0, "undulating": 1, "block": 2, "conjugate": 3}
 
 # A minimal exercise database keyed by (muscle group, movement pattern).
 EXERCISE_DB: Dict[Tuple[str, str], List[str]] = {
@@ -101,11 +126,78 @@ EXERCISE_DB: Dict[Tuple[str, str], List[str]] = {
     ("Full Body", "Carry"): ["Farmer's Carry"],
 }
 
+# Reverse indexes for fallback lookups by muscle group or movement pattern.
+# Exercises are listed in EXERCISE_DB order.
+_BY_MG: Dict[str, List[str]] = {}
+_BY_MP: Dict[str, List[str]] = {}
+for (_m, _p), _ex_list in EXERCISE_DB.items():
+    _BY_MG.setdefault(_m, []).extend(_ex_list)
+    _BY_MP.setdefault(_p, []).extend(_ex_list)
+
+# (min, max) schemes cycled through by each progression type, stored as
+# plain tuples so the compiled helpers can treat them as constants.
+_REPS_UNDULATING = tuple(VOLUME_LEVELS[l] for l in ("High Volume", "Low Volume", "Medium Volume"))
+_REPS_BLOCK = tuple(VOLUME_LEVELS[l] for l in ("High Volume", "Medium Volume", "Low Volume"))
+_REPS_CONJUGATE = tuple(VOLUME_LEVELS[l] for l in ("Low Volume", "Medium Volume", "High Volume"))
+_RPE_UNDULATING = tuple(INTENSITY_LEVELS[l] for l in ("Low Intensity", "High Intensity", "Medium Intensity"))
+_RPE_BLOCK = tuple(INTENSITY_LEVELS[l] for l in ("Low Intensity", "Medium Intensity", "High Intensity"))
+_RPE_CONJUGATE = tuple(INTENSITY_LEVELS[l] for l in ("High Intensity", "Medium Intensity", "Low Intensity"))
+
 
 # -----------------------------------------------------------------------------
 # Helper functions
 # -----------------------------------------------------------------------------
 
+@njit(cache=True)
+def _distribute_targets_core(values: np.ndarray, ranks: np.ndarray, num_days: int) -> np.ndarray:
+    """Numeric core of `distribute_targets`.
+
+    ``values`` holds the sets per week of each target and ``ranks`` the
+    position of each target name in sorted order, used to break ties
+    between equal fractional parts.  Returns the target index for each day.
+    """
+    n = values.shape[0]
+    total_sets = 0.0
+    for i in range(n):
+        total_sets += max(values[i], 1.0)
+    # Floor allocations and allocate remaining based on fractional parts
+    counts = np.empty(n, dtype=np.int64)
+    fractional = np.empty(n, dtype=np.float64)
+    for i in range(n):
+        w = values[i] / total_sets * num_days
+        f = int(math.floor(w))
+        counts[i] = f
+        fractional[i] = w - f
+    remaining = num_days - counts.sum()
+    # Order targets by largest fractional part, then by name (descending)
+    order = np.arange(n)
+    for i in range(1, n):
+        j = i
+        while j > 0:
+            a = order[j]
+            b = order[j - 1]
+            if fractional[a] > fractional[b] or (fractional[a] == fractional[b] and ranks[a] > ranks[b]):
+                order[j] = b
+                order[j - 1] = a
+                j -= 1
+            else:
+                break
+    for i in range(remaining):
+        counts[order[i % n]] += 1
+    # Interleave targets to avoid clumping similar targets together
+    interleaved = np.empty(num_days, dtype=np.int64)
+    pos = 0
+    while pos < num_days:
+        for i in range(n):
+            if counts[i] > 0:
+                interleaved[pos] = i
+                pos += 1
+                counts[i] -= 1
+                if pos == num_days:
+                    break
+    return interleaved
+
+
 def distribute_targets(targets: Dict[str, int], num_days: int) -> List[str]:
     """Distribute targets proportionally across a number of days.
 
@@ -124,35 +216,11 @@ def distribute_targets(targets: Dict[str, int], num_days: int) -> List[str]:
     """
     if not targets or num_days <= 0:
         return ["" for _ in range(num_days)]
-    total_sets = sum(max(v, 1) for v in targets.values())
-    # Compute allocation weight per target
-    weights = {t: v / total_sets * num_days for t, v in targets.items()}
-    # Floor allocations and allocate remaining based on fractional parts
-    floor_days = {t: int(math.floor(w)) for t, w in weights.items()}
-    remaining = num_days - sum(floor_days.values())
-    fractional = sorted([(w - floor_days[t], t) for t, w in weights.items()], reverse=True)
-    schedule = []
-    # Build initial schedule from floor allocations
-    for t, count in floor_days.items():
-        schedule.extend([t] * count)
-    # Allocate remaining days
-    i = 0
-    while len(schedule) < num_days:
-        _, t = fractional[i % len(fractional)]
-        schedule.append(t)
-        i += 1
-    # Interleave targets to avoid clumping similar targets together
-    unique = list(targets.keys())
-    interleaved = []
-    counts = {t: schedule.count(t) for t in unique}
-    while len(interleaved) < num_days:
-        for t in unique:
-            if counts[t] > 0:
-                interleaved.append(t)
-                counts[t] -= 1
-                if len(interleaved) == num_days:
-                    break
-    return interleaved
+    names = list(targets.keys())
+    values = np.array([targets[t] for t in names], dtype=np.float64)
+    ranks = np.empty(len(names), dtype=np.int64)
+    ranks[sorted(range(len(names)), key=names.__getitem__)] = np.arange(len(names))
+    return [names[i] for i in _distribute_targets_core(values, ranks, num_days)]
 
 
 def choose_exercise(mg: str, mp: str) -> str:
@@ -164,17 +232,47 @@ def choose_exercise(mg: str, mp: str) -> str:
     if (mg, mp) in EXERCISE_DB and EXERCISE_DB[(mg, mp)]:
         return EXERCISE_DB[(mg, mp)][0]
     # Fallback to matching by muscle group
-    for (m, p), ex_list in EXERCISE_DB.items():
-        if m == mg and ex_list:
-            return ex_list[0]
+    if _BY_MG.get(mg):
+        return _BY_MG[mg][0]
     # Fallback to matching by movement pattern
-    for (m, p), ex_list in EXERCISE_DB.items():
-        if p == mp and ex_list:
-            return ex_list[0]
+    if _BY_MP.get(mp):
+        return _BY_MP[mp][0]
     return ""
 
 
-def adjust_reps(base_range: Tuple[int, int], week: int, total_weeks: int, progression: str,
+@njit(cache=True)
+def _adjust_reps_core(low: int, high: int, week: int, total_weeks: int, prog_code: int,
+                      day_of_week: int) -> Tuple[int, int]:
+    """Numeric core of `adjust_reps`; ``prog_code`` is a value from ``_PROG``."""
+    if prog_code == 0:
+        # Increase reps slightly each week (e.g. add 1 rep every week)
+        increment = week - 1
+        return low + increment, high + increment
+    elif prog_code == 1:
+        # Repeating cycle: high volume, low volume, medium volume
+        return _REPS_UNDULATING[(week - 1) % 3]
+    elif prog_code == 2:
+        # Divide program into three blocks: high, medium, then low volume
+        third = max(1, total_weeks // 3)
+        if week <= third:
+            return _REPS_BLOCK[0]
+        elif week <= 2 * third:
+            return _REPS_BLOCK[1]
+        else:
+            return _REPS_BLOCK[2]
+    elif prog_code == 3:
+        # Assign different schemes per day: Day1 max effort (low volume), Day2 dynamic (medium), Day3 repetition (high)
+        return _REPS_CONJUGATE[(day_of_week - 1) % 3]
+    # Default: no change
+    return low, high
+
+
+def progression_code(progression: str) -> int:
+    """Map a progression type name to its ``_PROG`` code (-1 if unknown)."""
+    return _PROG.get(progression.lower(), -1)
+
+
+def adjust_reps(base_range: Tuple[int, int], week: int, total_weeks: int, prog_code: int,
                 day_of_week: int = 1, days_per_week: int = 3) -> Tuple[int, int]:
     """Adjust the rep range based on the progression type.
 
@@ -192,8 +290,8 @@ def adjust_reps(base_range: Tuple[int, int], week: int, total_weeks: int, progre
         Current week index (1-indexed).
     total_weeks : int
         Total number of weeks in the program.
-    progression : str
-        Progression type (Linear, Undulating, Block, Conjugate).
+    prog_code : int
+        Progression code from ``_PROG`` (see `progression_code`).
     day_of_week : int
         Day index within the current week (1-indexed) for conjugate
         progression.
@@ -206,73 +304,48 @@ def adjust_reps(base_range: Tuple[int, int], week: int, total_weeks: int, progre
         Adjusted (min, max) reps.
     """
     low, high = base_range
-    if progression.lower() == "linear":
-        # Increase reps slightly each week (e.g. add 1 rep every week)
-        increment = week - 1
-        return low + increment, high + increment
-    elif progression.lower() == "undulating":
-        # Define a repeating cycle: high volume, low volume, medium volume
-        cycle = ["High Volume", "Low Volume", "Medium Volume"]
-        index = (week - 1) % len(cycle)
-        label = cycle[index]
-        return VOLUME_LEVELS[label]
-    elif progression.lower() == "block":
-        # Divide program into three blocks
+    return _adjust_reps_core(low, high, week, total_weeks, prog_code, day_of_week)
+
+
+@njit(cache=True)
+def _adjust_rpe_core(low: int, high: int, week: int, total_weeks: int, prog_code: int,
+                     day_of_week: int) -> Tuple[int, int]:
+    """Numeric core of `adjust_rpe`; ``prog_code`` is a value from ``_PROG``."""
+    if prog_code == 0:
+        # Gradually increase intensity: add 0.5 RPE every two weeks
+        increment = (week - 1) // 2 * 0.5
+        return int(low + increment), int(high + increment)
+    elif prog_code == 1:
+        return _RPE_UNDULATING[(week - 1) % 3]
+    elif prog_code == 2:
         third = max(1, total_weeks // 3)
         if week <= third:
-            return VOLUME_LEVELS["High Volume"]
+            return _RPE_BLOCK[0]
         elif week <= 2 * third:
-            return VOLUME_LEVELS["Medium Volume"]
+            return _RPE_BLOCK[1]
         else:
-            return VOLUME_LEVELS["Low Volume"]
-    elif progression.lower() == "conjugate":
-        # Assign different schemes per day: Day1 max effort (low volume), Day2 dynamic (medium), Day3 repetition (high)
-        schemes = ["Low Volume", "Medium Volume", "High Volume"]
-        idx = (day_of_week - 1) % len(schemes)
-        label = schemes[idx]
-        return VOLUME_LEVELS[label]
-    # Default: no change
-    return base_range
+            return _RPE_BLOCK[2]
+    elif prog_code == 3:
+        return _RPE_CONJUGATE[(day_of_week - 1) % 3]
+    return low, high
 
 
-def adjust_rpe(base_rpe: Tuple[int, int], week: int, total_weeks: int, progression: str,
+def adjust_rpe(base_rpe: Tuple[int, int], week: int, total_weeks: int, prog_code: int,
                day_of_week: int = 1, days_per_week: int = 3) -> Tuple[int, int]:
     """Adjust the RPE range based on progression type.
 
     Uses similar logic to `adjust_reps` to vary intensity across the program.
     """
     low, high = base_rpe
-    if progression.lower() == "linear":
-        # Gradually increase intensity: add 0.5 RPE every two weeks
-        increment = (week - 1) // 2 * 0.5
-        return int(low + increment), int(high + increment)
-    elif progression.lower() == "undulating":
-        cycle = ["Low Intensity", "High Intensity", "Medium Intensity"]
-        index = (week - 1) % len(cycle)
-        label = cycle[index]
-        return INTENSITY_LEVELS[label]
-    elif progression.lower() == "block":
-        third = max(1, total_weeks // 3)
-        if week <= third:
-            return INTENSITY_LEVELS["Low Intensity"]
-        elif week <= 2 * third:
-            return INTENSITY_LEVELS["Medium Intensity"]
-        else:
-            return INTENSITY_LEVELS["High Intensity"]
-    elif progression.lower() == "conjugate":
-        schemes = ["High Intensity", "Medium Intensity", "Low Intensity"]
-        idx = (day_of_week - 1) % len(schemes)
-        label = schemes[idx]
-        return INTENSITY_LEVELS[label]
-    return base_rpe
+    return _adjust_rpe_core(low, high, week, total_weeks, prog_code, day_of_week)
 
 
 def select_exercises(mg: str, mp: str, num: int) -> List[str]:
     """Return a list of ``num`` exercises matching the given muscle group and pattern.
 
-    If there are not enough unique exercises in the database, the list
-    repeats entries as needed.  The order of exercises is determined
-    randomly to introduce variety.
+    If there are not enough unique exercises in the database, every
+    exercise is used once and the remainder is filled with random repeats.
+    The order of exercises is determined randomly to introduce variety.
 
     Parameters
     ----------
@@ -290,37 +363,87 @@ def select_exercises(mg: str, mp: str, num: int) -> List[str]:
     """
     if num <= 0:
         return []
-    choices: List[str] = []
+    # Collect unique candidates in priority order as they are found
+    unique_choices: List[str] = []
+    seen = set()
+
+    def add(ex_list: List[str]) -> None:
+        for ex in ex_list:
+            if ex not in seen:
+                seen.add(ex)
+                unique_choices.append(ex)
+
     # Primary matches
-    key = (mg, mp)
-    if key in EXERCISE_DB:
-        choices.extend(EXERCISE_DB[key])
-    # Secondary matches: same muscle group
-    for (m, p), ex_list in EXERCISE_DB.items():
-        if m == mg and (m, p) != key:
-            choices.extend(ex_list)
-    # Secondary matches: same pattern
-    for (m, p), ex_list in EXERCISE_DB.items():
-        if p == mp and (m, p) != key and m != mg:
-            choices.extend(ex_list)
+    add(EXERCISE_DB.get((mg, mp), []))
+    # Secondary matches: same muscle group, then same pattern
+    add(_BY_MG.get(mg, []))
+    add(_BY_MP.get(mp, []))
     # If still empty, take all exercises in database
-    if not choices:
+    if not unique_choices:
         for ex_list in EXERCISE_DB.values():
-            choices.extend(ex_list)
-    # Ensure deterministic order but vary selection using random sample
-    # Remove duplicates
-    unique_choices = list(dict.fromkeys(choices))
-    # If not enough unique exercises, repeat the list
-    result: List[str] = []
-    while len(result) < num:
-        # Shuffle a copy to vary order
-        pool = unique_choices.copy()
-        random.shuffle(pool)
-        for ex in pool:
-            result.append(ex)
-            if len(result) == num:
-                break
-    return result[:num]
+            add(ex_list)
+    # Draw without replacement; if there are not enough unique exercises,
+    # take them all in random order and top up with random repeats
+    if num <= len(unique_choices):
+        return _RNG.sample(unique_choices, num)
+    return (_RNG.sample(unique_choices, len(unique_choices))
+            + _RNG.choices(unique_choices, k=num - len(unique_choices)))
+
+
+# Number of exercise selections drawn per day and section; weeks cycle
+# through them so consecutive weeks still vary.
+_NUM_VARIANTS = 4
+
+
+def _variants(mg: str, mp: str, num: int) -> Tuple[Tuple[str, ...], ...]:
+    """Return ``_NUM_VARIANTS`` independent selections from `select_exercises`.
+
+    `generate_program` draws these once per day and section, so repeated
+    weeks reuse pre-built lists instead of rescanning the database.
+    """
+    return tuple(tuple(select_exercises(mg, mp, num)) for _ in range(_NUM_VARIANTS))
+
+
+def _categorical(values: List[str], categories: List[str]) -> pd.Categorical:
+    """Wrap ``values`` in a Categorical with a known category order.
+
+    Any value missing from ``categories`` (e.g. a custom target name) is
+    appended rather than silently becoming NaN.
+    """
+    known = list(dict.fromkeys(categories))
+    seen = set(known)
+    extra = [v for v in dict.fromkeys(values) if v not in seen]
+    return pd.Categorical(values, categories=known + extra)
+
+
+@functools.lru_cache(maxsize=64)
+def split_sets(total_sets: int, num_ex: int) -> Tuple[int, ...]:
+    """Split a number of sets as evenly as possible across exercises.
+
+    Earlier exercises receive any remainder, and each exercise gets at
+    least one set when ``total_sets`` is positive.  Results are cached
+    because the same pairs recur for every week of a program.
+
+    Parameters
+    ----------
+    total_sets : int
+        Total sets for the section.
+    num_ex : int
+        Number of exercises in the section.
+
+    Returns
+    -------
+    Tuple[int, ...]
+        Sets per exercise, of length ``num_ex``.
+    """
+    if total_sets <= 0 or num_ex <= 0:
+        return (0,) * num_ex
+    base = total_sets // num_ex
+    remainder = total_sets % num_ex
+    sets_list = [base] * num_ex
+    for i in range(remainder):
+        sets_list[i] += 1
+    return tuple(max(1, s) for s in sets_list)
 
 
 def generate_program(num_weeks: int, days_per_week: int,
@@ -362,6 +485,7 @@ def generate_program(num_weeks: int, days_per_week: int,
     """
     base_reps = VOLUME_LEVELS.get(volume_level, (6, 15))
     base_rpe = INTENSITY_LEVELS.get(intensity_level, (7, 8))
+    prog_code = progression_code(progression)
     muscle_schedule = distribute_targets(muscle_targets, days_per_week)
     pattern_schedule = distribute_targets(pattern_targets, days_per_week)
     # Ensure lists have correct length
@@ -369,90 +493,308 @@ def generate_program(num_weeks: int, days_per_week: int,
         muscle_schedule = ["" for _ in range(days_per_week)]
     if not pattern_schedule:
         pattern_schedule = ["" for _ in range(days_per_week)]
-    rows = []
+    # Reps and RPE ranges depend only on (week, day), so build them once
+    # up front rather than inside the exercise loops
+    reps_table = [
+        [adjust_reps(base_reps, w, num_weeks, prog_code, d + 1, days_per_week)
+         for d in range(days_per_week)]
+        for w in range(1, num_weeks + 1)
+    ]
+    rpe_table = [
+        [adjust_rpe(base_rpe, w, num_weeks, prog_code, d + 1, days_per_week)
+         for d in range(days_per_week)]
+        for w in range(1, num_weeks + 1)
+    ]
+    # Only a handful of distinct RPE ranges occur, so format each label once
+    rpe_labels: Dict[Tuple[int, int], str] = {}
+    for week_rpe in rpe_table:
+        for lo, hi in week_rpe:
+            if (lo, hi) not in rpe_labels:
+                rpe_labels[(lo, hi)] = f"{lo}-{hi} RPE" if lo != hi else f"{lo} RPE"
+    rpe_str_table = [[rpe_labels[rpe_range] for rpe_range in week_rpe] for week_rpe in rpe_table]
+    # Sets per day for each muscle group (ceiling of the weekly target)
+    sets_per_day = {mg: int(-(-v // days_per_week)) for mg, v in muscle_targets.items() if mg}
+    # Targets, accessory rotation, set splits and exercise selections
+    # depend only on the day, so compute them once rather than for every
+    # week
+    per_day = []
+    for day_idx in range(days_per_week):
+        mg = muscle_schedule[day_idx]
+        mp = pattern_schedule[day_idx]
+        # Secondary selection for accessory: rotate to next target
+        acc_mg = muscle_schedule[(day_idx + 1) % len(muscle_schedule)] if muscle_schedule else ""
+        acc_mp = pattern_schedule[(day_idx + 1) % len(pattern_schedule)] if pattern_schedule else ""
+        # Determine sets per day for each section (based on muscle targets)
+        sets_wod_total = sets_per_day.get(mg, 0)
+        sets_acc_total = sets_per_day.get(acc_mg, 0)
+        per_day.append({
+            "mg": mg,
+            "mp": mp,
+            "acc_mg": acc_mg,
+            "acc_mp": acc_mp,
+            "wod_sets_list": split_sets(sets_wod_total, num_wod_ex),
+            "acc_sets_list": split_sets(sets_acc_total, num_acc_ex),
+            # Exercise selections for this day only, drawn separately for
+            # each section so the accessory block never mirrors the WOD
+            "wod_variants": _variants(mg, mp, num_wod_ex),
+            "acc_variants": _variants(acc_mg, acc_mp, num_acc_ex),
+        })
+    # A fixed AMRAP format replaces the rep count on every exercise row, so
+    # clean it once for the whole program
+    amrap_reps_str = None
+    if wod_style == "AMRAP" and amrap_format:
+        amrap_reps_str = amrap_format.replace("(", "").replace(")", "")  # clean parentheses
+    # Exercise rows take their Reps/Time label from ``reps_iter``: either
+    # the AMRAP label repeated, or random rep counts drawn up front in one
+    # vectorised call.  Each (week, day) contributes one draw per WOD and
+    # accessory exercise, in the order the rows are emitted below.  The
+    # generator is seeded from ``_RNG`` so seeding it still reproduces a
+    # program.
+    if amrap_reps_str is not None:
+        reps_iter = itertools.repeat(amrap_reps_str)
+    else:
+        ex_per_day = max(num_wod_ex, 0) + max(num_acc_ex, 0)
+        bounds = np.asarray(reps_table, dtype=np.int64).reshape(-1, 2)
+        lo_per_row = np.repeat(bounds[:, 0], ex_per_day)
+        hi_per_row = np.repeat(bounds[:, 1], ex_per_day)
+        rng = np.random.default_rng(_RNG.getrandbits(64))
+        reps_arr = rng.integers(low=lo_per_row, high=hi_per_row + 1)
+        reps_iter = iter(np.char.add(reps_arr.astype(str), " reps").tolist())
+    # Build the outline column by column; DataFrame construction from
+    # lists is much cheaper than from a list of per-row dicts
+    col_week: List[int] = []
+    col_day: List[int] = []
+    col_section: List[str] = []
+    col_style: List[str] = []
+    col_mg: List[str] = []
+    col_mp: List[str] = []
+    col_ex: List[str] = []
+    col_sets: List[object] = []
+    col_reps: List[str] = []
+    col_rpe: List[str] = []
+
+    def _emit(week: int, day: int, section: str, style: str, mg: str, mp: str,
+              ex: str, sets: object, reps_str: str, rpe_str: str) -> None:
+        col_week.append(week)
+        col_day.append(day)
+        col_section.append(section)
+        col_style.append(style)
+        col_mg.append(mg)
+        col_mp.append(mp)
+        col_ex.append(ex)
+        col_sets.append(sets)
+        col_reps.append(reps_str)
+        col_rpe.append(rpe_str)
+
     for week in range(1, num_weeks + 1):
         for day_idx in range(days_per_week):
             day = day_idx + 1
-            mg = muscle_schedule[day_idx]
-            mp = pattern_schedule[day_idx]
-            # Select multiple exercises
-            wod_ex_list = select_exercises(mg, mp, num_wod_ex)
-            # Secondary selection for accessory: rotate to next target and pick exercises
-            acc_mg = muscle_schedule[(day_idx + 1) % len(muscle_schedule)] if muscle_schedule else ""
-            acc_mp = pattern_schedule[(day_idx + 1) % len(pattern_schedule)] if pattern_schedule else ""
-            acc_ex_list = select_exercises(acc_mg, acc_mp, num_acc_ex)
-            # Compute reps and RPE ranges (one per section; will randomise per exercise later)
-            reps_range = adjust_reps(base_reps, week, num_weeks, progression, day, days_per_week)
-            rpe_range = adjust_rpe(base_rpe, week, num_weeks, progression, day, days_per_week)
-            # Determine sets per day for each section (based on muscle targets)
-            sets_wod_total = math.ceil(muscle_targets.get(mg, 0) / days_per_week) if mg else 0
-            sets_acc_total = math.ceil(muscle_targets.get(acc_mg, 0) / days_per_week) if acc_mg else 0
-            # Helper to split sets across exercises; ensures at least one set if total_sets > 0
-            def split_sets(total_sets: int, num_ex: int) -> List[int]:
-                if total_sets <= 0 or num_ex <= 0:
-                    return [0] * num_ex
-                base = total_sets // num_ex
-                remainder = total_sets % num_ex
-                sets_list = [base] * num_ex
-                for i in range(remainder):
-                    sets_list[i] += 1
-                sets_list = [max(1, s) for s in sets_list]
-                return sets_list
-            wod_sets_list = split_sets(sets_wod_total, len(wod_ex_list))
-            acc_sets_list = split_sets(sets_acc_total, len(acc_ex_list))
+            d = per_day[day_idx]
+            # Cycle through the day's selections so sessions vary across weeks
+            variant = week % _NUM_VARIANTS
+            wod_ex_list = d["wod_variants"][variant]
+            acc_ex_list = d["acc_variants"][variant]
+            # Look up the RPE label (one per section)
+            rpe_str = rpe_str_table[week - 1][day_idx]
             # Warm-Up row
-            rows.append({
-                "Week": week,
-                "Day": day,
-                "Section": "Warm-Up",
-                "Style": warm_style,
-                "Muscle Group": "",
-                "Movement Pattern": "",
-                "Exercise": "",
-                "Sets": "",
-                "Reps/Time": "",
-                "RPE Range": f"{rpe_range[0]}-{rpe_range[1]} RPE" if rpe_range[0] != rpe_range[1] else f"{rpe_range[0]} RPE",
-            })
-            # WOD rows
-            for ex, sets_per_ex in zip(wod_ex_list, wod_sets_list):
-                # Choose random rep within range unless AMRAP format is set
-                if wod_style == "AMRAP" and amrap_format:
-                    rep_time_str = amrap_format.replace("(", "").replace(")", "")  # clean parentheses
-                else:
-                    rep_val = random.randint(reps_range[0], reps_range[1])
-                    rep_time_str = f"{rep_val} reps"
-                rows.append({
-                    "Week": week,
-                    "Day": day,
-                    "Section": "WOD",
-                    "Style": wod_style,
-                    "Muscle Group": mg,
-                    "Movement Pattern": mp,
-                    "Exercise": ex,
-                    "Sets": sets_per_ex if sets_per_ex > 0 else "",
-                    "Reps/Time": rep_time_str,
-                    "RPE Range": f"{rpe_range[0]}-{rpe_range[1]} RPE" if rpe_range[0] != rpe_range[1] else f"{rpe_range[0]} RPE",
-                })
-            # Accessory rows
-            for ex, sets_per_ex in zip(acc_ex_list, acc_sets_list):
-                if wod_style == "AMRAP" and amrap_format:
-                    rep_time_str = amrap_format.replace("(", "").replace(")", "")
-                else:
-                    rep_val = random.randint(reps_range[0], reps_range[1])
-                    rep_time_str = f"{rep_val} reps"
-                rows.append({
-                    "Week": week,
-                    "Day": day,
-                    "Section": "Accessory",
-                    "Style": acc_style,
-                    "Muscle Group": acc_mg,
-                    "Movement Pattern": acc_mp,
-                    "Exercise": ex,
-                    "Sets": sets_per_ex if sets_per_ex > 0 else "",
-                    "Reps/Time": rep_time_str,
-                    "RPE Range": f"{rpe_range[0]}-{rpe_range[1]} RPE" if rpe_range[0] != rpe_range[1] else f"{rpe_range[0]} RPE",
-                })
-    return pd.DataFrame(rows)
+            _emit(week, day, "Warm-Up", warm_style, "", "", "", "", "", rpe_str)
+            # WOD rows, then Accessory rows
+            sections = (
+                ("WOD", wod_style, d["mg"], d["mp"], wod_ex_list, d["wod_sets_list"]),
+                ("Accessory", acc_style, d["acc_mg"], d["acc_mp"], acc_ex_list, d["acc_sets_list"]),
+            )
+            for section, style, mg, mp, ex_list, sets_list in sections:
+                for ex, sets_per_ex in zip(ex_list, sets_list):
+                    _emit(week, day, section, style, mg, mp, ex,
+                          sets_per_ex if sets_per_ex > 0 else "", next(reps_iter), rpe_str)
+    # Low-cardinality text columns are stored as categoricals
+    return pd.DataFrame({
+        "Week": col_week,
+        "Day": col_day,
+        "Section": _categorical(col_section, ["Warm-Up", "WOD", "Accessory"]),
+        "Style": _categorical(col_style, WARM_UP_TYPES + WOD_STYLES),
+        "Muscle Group": _categorical(col_mg, MUSCLE_GROUPS + [""]),
+        "Movement Pattern": _categorical(col_mp, MOVEMENT_PATTERNS + [""]),
+        "Exercise": col_ex,
+        "Sets": col_sets,
+        "Reps/Time": col_reps,
+        "RPE Range": _categorical(col_rpe, list(rpe_labels.values())),
+    })
+
+
+@st.cache_data(max_entries=32, ttl=None, show_spinner=False)
+def _generate_program_cached(num_weeks: int, days_per_week: int,
+                             muscle_targets_items: Tuple[Tuple[str, int], ...],
+                             pattern_targets_items: Tuple[Tuple[str, int], ...],
+                             warm_style: str, wod_style: str, acc_style: str,
+                             volume_level: str, intensity_level: str,
+                             progression: str,
+                             num_wod_ex: int = 2, num_acc_ex: int = 2,
+                             amrap_format: str = None) -> pd.DataFrame:
+    """Memoised wrapper around `generate_program`.
+
+    Streamlit reruns the whole script on every widget interaction, so the
+    targets are passed as tuples of ``(name, sets)`` items to keep the
+    arguments hashable.  Item order is preserved because it determines
+    how targets are interleaved across the week.  Identical selections
+    return the cached DataFrame instead of rebuilding the schedule.
+    """
+    return generate_program(
+        num_weeks=num_weeks,
+        days_per_week=days_per_week,
+        muscle_targets=dict(muscle_targets_items),
+        pattern_targets=dict(pattern_targets_items),
+        warm_style=warm_style,
+        wod_style=wod_style,
+        acc_style=acc_style,
+        volume_level=volume_level,
+        intensity_level=intensity_level,
+        progression=progression,
+        num_wod_ex=num_wod_ex,
+        num_acc_ex=num_acc_ex,
+        amrap_format=amrap_format,
+    )
+
+
+# Outlines longer than this are exported by writing the sheet XML directly.
+_FAST_XLSX_MIN_ROWS = 5000
+
+_XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    '<Override PartName="/xl/sharedStrings.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>'
+    '</Types>'
+)
+_XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    '</Relationships>'
+)
+_XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Program Outline" sheetId="1" r:id="rId1"/></sheets>'
+    '</workbook>'
+)
+_XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    '<Relationship Id="rId2" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" '
+    'Target="sharedStrings.xml"/>'
+    '</Relationships>'
+)
+
+
+def _df_to_xlsx_fast(df: pd.DataFrame) -> bytes:
+    """Write ``df`` as a single-sheet ``.xlsx`` file without openpyxl.
+
+    The worksheet XML is streamed straight into the zip archive row by
+    row, and every text value goes into a shared string table, so no
+    per-cell Python objects are created.  Used by `program_to_xlsx` for
+    very large outlines.
+    """
+    sst: Dict[str, int] = {}
+    sst_count = 0
+    letters = [get_column_letter(i + 1) for i in range(len(df.columns))]
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        zf.writestr("[Content_Types].xml", _XLSX_CONTENT_TYPES)
+        zf.writestr("_rels/.rels", _XLSX_ROOT_RELS)
+        zf.writestr("xl/workbook.xml", _XLSX_WORKBOOK)
+        zf.writestr("xl/_rels/workbook.xml.rels", _XLSX_WORKBOOK_RELS)
+        with zf.open("xl/worksheets/sheet1.xml", "w") as f:
+            f.write(
+                b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+                b'<sheetData>'
+            )
+            rows = itertools.chain([tuple(df.columns)], df.itertuples(index=False, name=None))
+            for r, row in enumerate(rows, start=1):
+                cells = []
+                for col, value in zip(letters, row):
+                    if value is None or (isinstance(value, float) and math.isnan(value)):
+                        continue
+                    if isinstance(value, (bool, np.bool_)):
+                        cells.append(f'<c r="{col}{r}" t="b"><v>{int(value)}</v></c>')
+                    elif isinstance(value, (int, float, np.integer, np.floating)):
+                        cells.append(f'<c r="{col}{r}"><v>{value}</v></c>')
+                    else:
+                        text = str(value)
+                        idx = sst.get(text)
+                        if idx is None:
+                            idx = sst[text] = len(sst)
+                        sst_count += 1
+                        cells.append(f'<c r="{col}{r}" t="s"><v>{idx}</v></c>')
+                f.write(f'<row r="{r}">{"".join(cells)}</row>'.encode("utf-8"))
+            f.write(b'</sheetData></worksheet>')
+        with zf.open("xl/sharedStrings.xml", "w") as f:
+            f.write(
+                '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+                '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+                f'count="{sst_count}" uniqueCount="{len(sst)}">'.encode("utf-8")
+            )
+            for text in sst:
+                f.write(f'<si><t xml:space="preserve">{escape(text)}</t></si>'.encode("utf-8"))
+            f.write(b'</sst>')
+    return buf.getvalue()
+
+
+def program_to_xlsx(program_df: pd.DataFrame) -> bytes:
+    """Serialise the program outline to an in-memory Excel workbook.
+
+    Uses openpyxl's write-only mode so rows are streamed into the sheet
+    rather than held as a full grid of cell objects.  Outlines longer than
+    ``_FAST_XLSX_MIN_ROWS`` rows skip openpyxl and are written directly by
+    `_df_to_xlsx_fast`.  Nothing is written to disk, so the export also
+    works from a read-only directory.
+
+    Parameters
+    ----------
+    program_df : pd.DataFrame
+        Program outline produced by `generate_program`.
+
+    Returns
+    -------
+    bytes
+        Contents of the ``.xlsx`` file.
+    """
+    if len(program_df) > _FAST_XLSX_MIN_ROWS:
+        return _df_to_xlsx_fast(program_df)
+    wb = openpyxl.Workbook(write_only=True)
+    ws = wb.create_sheet("Program Outline")
+    ws.append(list(program_df.columns))
+    for row in program_df.itertuples(index=False, name=None):
+        ws.append(row)
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+@st.cache_data(max_entries=32, ttl=None, show_spinner=False)
+def program_to_xlsx_bytes(params_key: tuple) -> bytes:
+    """Return the Excel export for a set of program parameters.
+
+    ``params_key`` is the positional argument tuple accepted by
+    `_generate_program_cached`, so a cache hit skips both building the
+    DataFrame and serialising the workbook.
+    """
+    program_df = _generate_program_cached(*params_key)
+    return program_to_xlsx(program_df)
 
 
 # -----------------------------------------------------------------------------
@@ -520,28 +862,31 @@ def main() -> None:
         if num_weeks <= 0 or days_per_week <= 0:
             st.error("Please specify a positive number of weeks and days per week.")
         else:
-            program_df = generate_program(
-                num_weeks=num_weeks,
-                days_per_week=days_per_week,
-                muscle_targets=muscle_targets,
-                pattern_targets=pattern_targets,
-                warm_style=warm_style,
-                wod_style=wod_style,
-                acc_style=acc_style,
-                volume_level=volume_level,
-                intensity_level=intensity_level,
-                progression=progression,
-                num_wod_ex=int(num_wod_ex),
-                num_acc_ex=int(num_acc_ex),
-                amrap_format=amrap_format,
+            params_key = (
+                num_weeks,
+                days_per_week,
+                tuple(muscle_targets.items()),
+                tuple(pattern_targets.items()),
+                warm_style,
+                wod_style,
+                acc_style,
+                volume_level,
+                intensity_level,
+                progression,
+                int(num_wod_ex),
+                int(num_acc_ex),
+                amrap_format,
             )
+            program_df = _generate_program_cached(*params_key)
             st.success("Program generated!")
             st.dataframe(program_df)
             # Provide download option as Excel
-            with pd.ExcelWriter("program_output.xlsx", engine="openpyxl") as writer:
-                program_df.to_excel(writer, index=False, sheet_name="Program Outline")
-            with open("program_output.xlsx", "rb") as f:
-                st.download_button("Download as Excel", f, file_name="program_output.xlsx")
+            st.download_button(
+                "Download as Excel",
+                data=program_to_xlsx_bytes(params_key),
+                file_name="program_output.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            )
     # Show instructions
     st.markdown(
         """